@@ -0,0 +1,198 @@
+# admission.py (upload guardrails: size / pixel / page limits + memory budget)
+import math
+import os
+import threading
+from contextlib import contextmanager
+
+# -------------------------------------------------------------------------
+# ✅ LIMITS (override with environment variables)
+# -------------------------------------------------------------------------
+
+MB = 1024 * 1024
+
+# Raw request body size accepted by /api/extract
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_MB", "20")) * MB
+
+# Hard limit: anything above this is rejected without being decoded
+MAX_IMAGE_PIXELS = int(os.getenv("MAX_IMAGE_PIXELS", str(80_000_000)))
+
+# Soft limit: images / rendered pages above this are downsampled before OCR
+OCR_TARGET_PIXELS = int(os.getenv("OCR_TARGET_PIXELS", str(12_000_000)))
+
+MAX_PDF_PAGES = int(os.getenv("MAX_PDF_PAGES", "10"))
+PDF_DPI = 350
+
+# Below this DPI text is too small to read; PDFs that would need less are rejected
+MIN_PDF_DPI = int(os.getenv("MIN_PDF_DPI", "150"))
+
+# Memory one worker may spend on decoded pages of in-flight jobs
+WORKER_MEMORY_BUDGET = int(os.getenv("WORKER_MEMORY_BUDGET_MB", "1024")) * MB
+
+# Share of the budget one document may take, so two jobs can run side by side.
+# With the defaults a 10-page A4 PDF is rendered at ~215 DPI (512 MB);
+# it only gets rejected if it would need less than MIN_PDF_DPI (~260 MB).
+MAX_JOB_BYTES = int(os.getenv("MAX_JOB_MB", str(WORKER_MEMORY_BUDGET // MB // 2))) * MB
+
+# Seconds a job waits for budget before it is turned away
+ADMISSION_TIMEOUT = float(os.getenv("ADMISSION_TIMEOUT", "5"))
+
+# RGB bytes per pixel x working copies EasyOCR makes (resize, grey, float)
+BYTES_PER_PIXEL = 3 * 4
+
+
+class AdmissionError(Exception):
+    """Raised when an upload is refused; carries the HTTP status to return."""
+
+    def __init__(self, message, status_code=413):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+# -------------------------------------------------------------------------
+# ✅ Per-worker memory budget
+# -------------------------------------------------------------------------
+
+class MemoryBudget:
+    """
+    Counting semaphore over bytes. Every in-flight OCR job reserves its
+    estimated footprint; jobs wait (briefly) when the worker is full.
+    """
+
+    def __init__(self, limit_bytes):
+        self.limit = limit_bytes
+        self.in_use = 0
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def reserve(self, nbytes, timeout=ADMISSION_TIMEOUT):
+        if nbytes > self.limit:
+            raise AdmissionError("Document too large to process")
+
+        with self._cond:
+            fits = self._cond.wait_for(lambda: self.in_use + nbytes <= self.limit, timeout)
+            if not fits:
+                raise AdmissionError("Server busy, please retry", status_code=503)
+            self.in_use += nbytes
+
+        try:
+            yield
+        finally:
+            with self._cond:
+                self.in_use -= nbytes
+                self._cond.notify_all()
+
+
+MEMORY_BUDGET = MemoryBudget(WORKER_MEMORY_BUDGET)
+
+# -------------------------------------------------------------------------
+# ✅ Header-only inspection (nothing is fully decoded here)
+# -------------------------------------------------------------------------
+
+def _pil_image():
+    # Imported on first use so mapping-only workers never load PIL
+    from PIL import Image
+
+    # Let Pillow raise DecompressionBombError on anything beyond our hard limit
+    Image.MAX_IMAGE_PIXELS = MAX_IMAGE_PIXELS
+    return Image
+
+
+def _fit_to_target(width, height, target=OCR_TARGET_PIXELS):
+    """Return (width, height) scaled down to at most `target` pixels."""
+    pixels = width * height
+    if pixels <= target:
+        return width, height
+    scale = math.sqrt(target / pixels)
+    return max(1, int(width * scale)), max(1, int(height * scale))
+
+
+def plan_image(path):
+    Image = _pil_image()
+    try:
+        with Image.open(path) as img:  # lazy: only the header is read
+            width, height = img.size
+            bands = len(img.getbands())
+            fmt = img.format
+    except Image.DecompressionBombError:
+        raise AdmissionError("Image exceeds pixel limit")
+    except Exception:
+        raise AdmissionError("Unreadable image file", status_code=400)
+
+    if width * height > MAX_IMAGE_PIXELS:
+        raise AdmissionError("Image exceeds pixel limit")
+
+    target = _fit_to_target(width, height)
+    target_pixels = target[0] * target[1]
+
+    # What load_image decodes before it can shrink: JPEG's draft() decodes at
+    # 1/2, 1/4 or 1/8 scale (never below the target, so < 4x its pixels);
+    # every other format is decoded at full size.
+    decoded_pixels = width * height
+    if fmt == "JPEG":
+        decoded_pixels = min(decoded_pixels, 4 * target_pixels)
+
+    estimated = (
+        decoded_pixels * bands          # decoded image in its own mode
+        + decoded_pixels * 3            # convert("RGB") copy
+        + target_pixels * BYTES_PER_PIXEL  # thumbnail + OCR working copies
+    )
+    if estimated > MAX_JOB_BYTES:
+        raise AdmissionError("Image too large to decode within the memory limit")
+
+    return {
+        "kind": "image",
+        "size": (width, height),
+        "target_size": target,
+        "estimated_bytes": estimated,
+    }
+
+
+def plan_pdf(path):
+    import fitz  # PyMuPDF
+
+    try:
+        doc = fitz.open(path)
+    except Exception:
+        raise AdmissionError("Unreadable PDF file", status_code=400)
+
+    with doc:
+        pages = doc.page_count
+        if pages == 0:
+            raise AdmissionError("PDF has no pages", status_code=400)
+        if pages > MAX_PDF_PAGES:
+            raise AdmissionError(f"PDF has {pages} pages (limit {MAX_PDF_PAGES})")
+        # page.rect is in points (1/72 inch); no rendering happens here
+        largest = max(page.rect.width * page.rect.height for page in doc)
+
+    dpi = PDF_DPI
+    if largest > 0:
+        # Each page under OCR_TARGET_PIXELS, and all pages together under
+        # MAX_JOB_BYTES (pdf_to_images keeps every page in memory)
+        page_dpi = 72 * math.sqrt(OCR_TARGET_PIXELS / largest)
+        job_dpi = 72 * math.sqrt(MAX_JOB_BYTES / (BYTES_PER_PIXEL * pages * largest))
+        dpi = min(PDF_DPI, int(page_dpi), int(job_dpi))
+        if dpi < MIN_PDF_DPI:
+            raise AdmissionError(
+                f"PDF pages too large to OCR ({pages} pages would need {dpi} DPI, minimum {MIN_PDF_DPI})")
+
+    page_pixels = largest * (dpi / 72) ** 2
+    return {
+        "kind": "pdf",
+        "pages": pages,
+        "dpi": dpi,
+        "estimated_bytes": int(page_pixels * pages * BYTES_PER_PIXEL),
+    }
+
+
+def plan_document(path):
+    """
+    Inspect an uploaded file cheaply and decide how (or whether) to OCR it.
+    Raises AdmissionError for anything that should be rejected.
+    """
+    if os.path.getsize(path) > MAX_UPLOAD_BYTES:
+        raise AdmissionError("File exceeds upload size limit")
+
+    ext = os.path.splitext(path)[1].lower()
+    plan = plan_pdf(path) if ext == ".pdf" else plan_image(path)
+    print(f"[ADMISSION] {os.path.basename(path)} → {plan}")
+    return plan
@@ -1,28 +1,77 @@
 # backend/app.py - CORRECTED FOR YOUR FOLDER STRUCTURE
 # Replace your current app.py with this
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response
 from flask_cors import CORS
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.utils import secure_filename
+import hmac
 import os
+import shutil
 import sys
+import tempfile
 
 # Add the forms folder to Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from ocr_utils import extract_text
-from entity_extract import extract_entities_with_ai
+# OCR (easyocr/torch/cv2/fitz) and LLM (openai) modules are imported inside
+# /api/extract, so mapping-only workers start fast and stay small.
+# Set PRELOAD_OCR=1 on OCR workers to import them and load the OCR models
+# (PRELOAD_SCRIPTS, default: every script group) at startup instead.
+from admission import AdmissionError, MAX_UPLOAD_BYTES
 from forms.templates import get_form_template, get_all_forms  # Import from YOUR location
 from form_mapper import FormMapper  # Use YOUR existing form_mapper
+from profiling import profiler, stage, collapsed, ADMIN_TOKEN
+
+if os.getenv('PRELOAD_OCR') == '1':
+    import entity_extract
+    from ocr_utils import get_reader, SCRIPT_GROUPS
+    
+    entity_extract.get_client()
+    for script_group in os.getenv('PRELOAD_SCRIPTS', ','.join(SCRIPT_GROUPS)).split(','):
+        get_reader(script_group.strip())
 
 app = Flask(__name__)
 CORS(app)
 
+# Reject oversized bodies before they are buffered to disk
+app.config['MAX_CONTENT_LENGTH'] = MAX_UPLOAD_BYTES
+
 UPLOAD_FOLDER = './uploads'
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
 # Initialize the form mapper (use existing form_mapper.py)
 form_mapper = FormMapper()
 
+# ============================================================================
+# Profiling hooks (off unless enabled via header or admin endpoint)
+# ============================================================================
+def is_admin():
+    token = request.headers.get('X-Admin-Token', '')
+    # Compare bytes: compare_digest raises TypeError on non-ASCII str
+    return bool(ADMIN_TOKEN) and hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode())
+
+@app.before_request
+def start_profiling():
+    # Admin calls would use up the "next N" budget and fill the ring buffer
+    if request.path.startswith('/api/admin'):
+        return
+    forced = request.headers.get('X-Profile') == '1' and is_admin()
+    if profiler.should_profile(forced):
+        profiler.start(request.headers.get('X-Request-ID'), request.path)
+
+@app.after_request
+def finish_profiling(response):
+    profile = profiler.finish()
+    if profile:
+        response.headers['X-Profile-Id'] = profile['id']
+    return response
+
+@app.teardown_request
+def stop_profiling(exc):
+    # Unhandled errors skip after_request; make sure the sampler stops
+    profiler.finish()
+
 # ============================================================================
 # API 1: Get all available forms
 # ============================================================================
@@ -44,12 +93,22 @@ def get_forms():
 @app.route('/api/extract', methods=['POST'])
 def extract():
     """Extract entities from uploaded document using OCR + AI"""
+    upload_dir = None
     try:
-        if 'file' not in request.files:
+        if request.content_length and request.content_length > MAX_UPLOAD_BYTES:
+            return jsonify({'error': 'File exceeds upload size limit'}), 413
+
+        if 'file' not in request.files or not request.files['file'].filename:
             return jsonify({'error': 'No file provided'}), 400
         
+        from ocr_utils import extract_text
+        from entity_extract import extract_entities_with_ai
+        
         file = request.files['file']
-        filepath = os.path.join(UPLOAD_FOLDER, file.filename)
+        # Private directory per request so concurrent uploads with the same
+        # name can't clash; the name is kept since OCR guesses script from it
+        upload_dir = tempfile.mkdtemp(dir=UPLOAD_FOLDER)
+        filepath = os.path.join(upload_dir, secure_filename(file.filename) or 'upload')
         file.save(filepath)
         
         print("\n" + "="*60)
@@ -66,14 +125,23 @@ def extract():
         entities = extract_entities_with_ai(ocr_text)
         print(f"[AI] Extracted entities: {entities}")
         
-        # Clean up
-        os.remove(filepath)
-        
         return jsonify(entities)
     
+    except RequestEntityTooLarge:
+        return jsonify({'error': 'File exceeds upload size limit'}), 413
+    
+    except AdmissionError as e:
+        print(f"[✗] Upload rejected: {str(e)}")
+        return jsonify({'error': str(e)}), e.status_code
+    
     except Exception as e:
         print(f"[✗] Server Error: {str(e)}")
         return jsonify({'error': str(e)}), 500
+    
+    finally:
+        # Clean up
+        if upload_dir:
+            shutil.rmtree(upload_dir, ignore_errors=True)
 
 # ============================================================================
 # API 3: Auto-fill form with intelligent mapping
@@ -99,7 +167,8 @@ def auto_fill():
         print(f"[MAPPING] Form template loaded: {form_template['formName']}")
         
         # Use form_mapper to fill form
-        mapping_result = form_mapper.auto_fill_form(extracted_entities, form_template)
+        with stage("mapping"):
+            mapping_result = form_mapper.auto_fill_form(extracted_entities, form_template)
         
         # Build response
         filled_form = {
@@ -124,6 +193,51 @@ def auto_fill():
         traceback.print_exc()
         return jsonify({'error': str(e)}), 500
 
+# ============================================================================
+# API 4: Profiling admin (requires X-Admin-Token = PROFILING_ADMIN_TOKEN)
+# ============================================================================
+@app.route('/api/admin/profiling', methods=['GET', 'POST'])
+def profiling_config():
+    """Profile the next N requests and/or a percentage of traffic"""
+    if not is_admin():
+        return jsonify({'error': 'Forbidden'}), 403
+    
+    if request.method == 'GET':
+        return jsonify(profiler.configure())
+    
+    data = request.json or {}
+    try:
+        state = profiler.configure(data.get('next'), data.get('percent'))
+    except (TypeError, ValueError):
+        return jsonify({'error': "'next' and 'percent' must be numbers"}), 400
+    print(f"[PROFILING] {state}")
+    return jsonify(state)
+
+@app.route('/api/admin/profiles', methods=['GET'])
+def list_profiles():
+    """Stored profiles (newest last) with per-stage timings"""
+    if not is_admin():
+        return jsonify({'error': 'Forbidden'}), 403
+    return jsonify({'profiles': profiler.list()})
+
+@app.route('/api/admin/profiles/<profile_id>', methods=['GET'])
+def download_profile(profile_id):
+    """Download one profile: JSON (default) or ?format=collapsed for flamegraphs"""
+    if not is_admin():
+        return jsonify({'error': 'Forbidden'}), 403
+    
+    profile = profiler.get(profile_id)
+    if not profile:
+        return jsonify({'error': f'Profile {profile_id} not found'}), 404
+    
+    if request.args.get('format') == 'collapsed':
+        return Response(
+            collapsed(profile),
+            mimetype='text/plain',
+            headers={'Content-Disposition': f'attachment; filename={profile_id}.folded'}
+        )
+    return jsonify(profile)
+
 # ============================================================================
 # Main Entry Point
 # ============================================================================
@@ -0,0 +1,104 @@
+# benchmarks/bench_backends.py
+# Latency, memory and text parity of each OCR backend (see ocr_backends.py).
+#
+# Usage:
+#   python benchmarks/bench_backends.py sample1.jpg sample2.png ... [--backends easyocr,onnx]
+#
+# Each backend runs in its own subprocess so RSS numbers are not mixed up.
+# Text from every backend is compared with the EasyOCR baseline; the script
+# exits non-zero if mean similarity falls below --min-similarity.
+
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from difflib import SequenceMatcher
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def max_rss_mb():
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def worker(backend_name, script, images, rounds):
+    import numpy as np
+    from PIL import Image
+
+    from ocr_backends import create_backend
+    from ocr_utils import SCRIPT_GROUPS
+
+    start = time.perf_counter()
+    backend = create_backend(SCRIPT_GROUPS[script], backend_name)
+    load_s = time.perf_counter() - start
+    load_rss = max_rss_mb()
+
+    arrays = [np.array(Image.open(p).convert("RGB")) for p in images]
+    backend.readtext(arrays[0])  # warm-up
+
+    texts, latencies = [], []
+    for _ in range(rounds):
+        texts = []
+        for arr in arrays:
+            t0 = time.perf_counter()
+            result = backend.readtext(arr)
+            latencies.append(time.perf_counter() - t0)
+            texts.append("\n".join([r[1] for r in result]))
+
+    print(json.dumps({
+        "backend": backend_name,
+        "load_s": load_s,
+        "load_rss_mb": load_rss,
+        "peak_rss_mb": max_rss_mb(),
+        "p50_ms": statistics.median(latencies) * 1000,
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "texts": texts,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("images", nargs="+")
+    parser.add_argument("--backends", default="easyocr,onnx")
+    parser.add_argument("--script", default="english")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--min-similarity", type=float, default=0.9)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, args.script, args.images, args.rounds)
+        return
+
+    reports = {}
+    for name in ["easyocr"] + [b for b in args.backends.split(",") if b != "easyocr"]:
+        out = subprocess.run(
+            [sys.executable, __file__, "--worker", name, "--script", args.script,
+             "--rounds", str(args.rounds), *args.images],
+            capture_output=True, text=True, check=True,
+        ).stdout
+        reports[name] = json.loads(out.strip().splitlines()[-1])
+
+    baseline = reports["easyocr"]["texts"]
+    failed = False
+    print(f"{'backend':>8} | {'load s':>7} | {'load MB':>8} | {'peak MB':>8} | {'p50 ms':>8} | {'mean ms':>8} | similarity")
+    for name, r in reports.items():
+        sims = [SequenceMatcher(None, a, b).ratio() for a, b in zip(baseline, r["texts"])]
+        similarity = statistics.mean(sims)
+        failed |= similarity < args.min_similarity
+        print(f"{name:>8} | {r['load_s']:7.2f} | {r['load_rss_mb']:8.0f} | {r['peak_rss_mb']:8.0f} | "
+              f"{r['p50_ms']:8.1f} | {r['mean_ms']:8.1f} | {similarity:.3f}")
+
+    if failed:
+        print(f"[✗] Text similarity below {args.min_similarity} against EasyOCR baseline")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
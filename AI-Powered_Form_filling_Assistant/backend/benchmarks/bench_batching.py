@@ -0,0 +1,76 @@
+# benchmarks/bench_batching.py
+# Throughput vs. latency of micro-batched recognition against plain readtext.
+#
+# Usage:
+#   python benchmarks/bench_batching.py sample1.jpg sample2.png ... [--threads 8] [--rounds 3]
+#
+# Runs every image `rounds` times from `threads` concurrent workers, once per
+# configuration (batching off, then each wait window), and prints images/s
+# plus p50/p95 per-call latency.
+
+import argparse
+import math
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from PIL import Image
+
+import ocr_batcher
+from ocr_utils import get_reader
+
+
+def run(reader, arrays, threads, wait_ms, max_batch):
+    ocr_batcher.BATCH_WAIT_MS = wait_ms
+    ocr_batcher._batchers.clear()
+    if wait_ms > 0:
+        ocr_batcher._batchers["bench"] = ocr_batcher.RecognitionBatcher(reader, max_batch, wait_ms)
+
+    latencies = []
+
+    def one(arr):
+        start = time.perf_counter()
+        ocr_batcher.read_pages(reader, "bench", [arr])
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(one, arrays))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, math.ceil(len(latencies) * 0.95) - 1)]  # nearest rank
+    label = "off" if wait_ms <= 0 else f"{wait_ms:g} ms"
+    print(f"{label:>8} | {len(arrays) / elapsed:8.2f} img/s | "
+          f"p50 {statistics.median(latencies) * 1000:8.1f} ms | p95 {p95 * 1000:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("images", nargs="+")
+    parser.add_argument("--script", default="english")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--max-batch", type=int, default=ocr_batcher.MAX_BATCH_CROPS)
+    parser.add_argument("--waits", default="0,10,20,30", help="comma separated wait windows in ms")
+    args = parser.parse_args()
+
+    reader = get_reader(args.script)
+    arrays = [np.array(Image.open(p).convert("RGB")) for p in args.images] * args.rounds
+
+    # Warm-up so model loading is not measured
+    reader.readtext(arrays[0])
+
+    print(f"{len(arrays)} images, {args.threads} threads, max batch {args.max_batch}")
+    print("  window |   throughput   |    latency")
+    for wait in args.waits.split(","):
+        run(reader, arrays, args.threads, float(wait), args.max_batch)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# benchmarks/bench_startup.py
+# Import time and RSS for each backend entry point, in a fresh interpreter.
+#
+# Usage:
+#   python benchmarks/bench_startup.py [--runs 5] [--modules app,form_mapper,...]
+#
+# Also lists which heavy dependencies each import pulled in, so a regression
+# (e.g. app importing torch again) is visible at a glance.
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENTRY_POINTS = ["app", "form_mapper", "forms.templates", "entity_extract", "ocr_utils", "bulk_process"]
+HEAVY = ["torch", "easyocr", "cv2", "fitz", "PIL", "numpy", "openai", "onnxruntime"]
+
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "seconds": elapsed,
+    "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "loaded": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+
+def probe(module):
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY)],
+        cwd=BACKEND_DIR, capture_output=True, text=True,
+    )
+    if out.returncode != 0:
+        return None, out.stderr.strip().splitlines()[-1]
+    return json.loads(out.stdout.strip().splitlines()[-1]), None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--modules", default=",".join(ENTRY_POINTS))
+    args = parser.parse_args()
+
+    print(f"{'entry point':>16} | {'import s':>8} | {'RSS MB':>7} | heavy deps loaded")
+    for module in args.modules.split(","):
+        runs, error = [], None
+        for _ in range(args.runs):
+            result, error = probe(module)
+            if error:
+                break
+            runs.append(result)
+        if error:
+            print(f"{module:>16} | failed: {error}")
+            continue
+        seconds = statistics.median(r["seconds"] for r in runs)
+        rss = statistics.median(r["rss_mb"] for r in runs)
+        print(f"{module:>16} | {seconds:8.3f} | {rss:7.0f} | {', '.join(runs[0]['loaded']) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+# bulk_process.py (offline re-extraction of document archives)
+#
+# Usage:
+#   python bulk_process.py ARCHIVE_DIR_OR_MANIFEST --output results.ndjson \
+#       [--form aadhaar_update --form pan_application] [--workers 4] [--no-ai]
+#       [--max-file-mb 200] [--max-pages 200] [--memory-mb 4096] [--retry-rejected]
+#
+# Runs the same pipeline as the API (extract_text → extract_entities_with_ai /
+# regex_fallback → FormMapper.auto_fill_form) over every document with a
+# process pool. The NDJSON output doubles as the checkpoint: re-running the
+# same command skips documents already processed successfully, so a crashed
+# run resumes and failed documents are retried. Documents refused by the
+# admission limits are not retried unless --retry-rejected is given (e.g.
+# after raising the limits).
+# An output ending in .parquet is written as NDJSON first and converted at
+# the end (needs pyarrow).
+
+import argparse
+import json
+import math
+import os
+import statistics
+import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import admission
+import ocr_backends
+import ocr_batcher
+from admission import AdmissionError
+from ocr_utils import extract_text
+from entity_extract import extract_entities_with_ai, regex_fallback
+from forms.templates import get_form_template, get_all_forms
+from form_mapper import FormMapper
+
+DOCUMENT_EXTENSIONS = {".pdf", ".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff", ".webp"}
+STAGES = ["ocr", "entities", "mapping"]
+
+# -------------------------------------------------------------------------
+# ✅ Input discovery
+# -------------------------------------------------------------------------
+
+def list_documents(source):
+    """All documents under a directory, or the paths listed in a manifest file."""
+    if os.path.isdir(source):
+        # Absolute paths so "./archive", "archive/" etc. match the checkpoint
+        paths = []
+        for root, _, files in os.walk(os.path.abspath(source)):
+            for name in files:
+                if os.path.splitext(name)[1].lower() in DOCUMENT_EXTENSIONS:
+                    paths.append(os.path.join(root, name))
+        return sorted(paths)
+
+    # Manifest: one path per line, relative to the manifest, '#' for comments
+    base = os.path.dirname(os.path.abspath(source))
+    with open(source, encoding="utf-8") as f:
+        lines = [line.strip() for line in f]
+    return [os.path.abspath(os.path.join(base, line)) for line in lines if line and not line.startswith("#")]
+
+# -------------------------------------------------------------------------
+# ✅ Checkpoint (= the NDJSON output itself)
+# -------------------------------------------------------------------------
+
+def load_checkpoint(ndjson_path, retry_rejected=False):
+    """
+    Paths already processed. Failed records and a half-written last line
+    from a crash are removed from the output, so those documents are retried
+    and each path ends up with exactly one record. Admission rejections are
+    deterministic and count as done unless `retry_rejected` is set.
+    """
+    done = set()
+    if not os.path.exists(ndjson_path):
+        return done
+
+    with open(ndjson_path, "rb") as f:
+        lines = f.read().splitlines(keepends=True)
+
+    kept, failed, broken = [], 0, 0
+    for line in lines:
+        try:
+            record = json.loads(line) if line.endswith(b"\n") else None
+        except ValueError:
+            record = None
+        if not record or "path" not in record:
+            broken += 1
+        elif record.get("error") and (retry_rejected or not record.get("rejected")):
+            failed += 1
+        else:
+            done.add(record["path"])
+            kept.append(line)
+
+    if failed or broken:
+        print(f"[BULK] Retrying {failed} failed documents, dropping {broken} incomplete records")
+        tmp_path = ndjson_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.writelines(kept)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, ndjson_path)
+    return done
+
+# -------------------------------------------------------------------------
+# ✅ Worker side
+# -------------------------------------------------------------------------
+
+_worker = {}
+
+
+def init_worker(form_ids, use_ai, threads, limits):
+    import torch
+
+    # Split the cores between processes instead of every worker using all
+    # of them (torch and ONNX Runtime default to one thread per core)
+    torch.set_num_threads(threads)
+    ocr_backends.ONNX_THREADS = threads
+
+    # Offline limits instead of the HTTP ones. A worker runs one document at
+    # a time, so that document may use the whole memory budget.
+    # MEMORY_BUDGET is updated in place: ocr_utils holds a reference to it.
+    admission.MAX_UPLOAD_BYTES = limits["max_file_bytes"]
+    admission.MAX_PDF_PAGES = limits["max_pages"]
+    admission.WORKER_MEMORY_BUDGET = admission.MAX_JOB_BYTES = limits["memory_bytes"]
+    admission.MEMORY_BUDGET.limit = limits["memory_bytes"]
+
+    # One document at a time per process: nothing to micro-batch with
+    ocr_batcher.BATCH_WAIT_MS = 0
+    _worker["forms"] = [get_form_template(fid) for fid in form_ids]
+    _worker["use_ai"] = use_ai
+    _worker["mapper"] = FormMapper()
+
+
+def _empty_record(path):
+    return {"path": path, "entities": None, "issues": None, "suggestions": None,
+            "forms": {}, "timings": {}, "error": None, "rejected": False}
+
+
+def process_document(path):
+    record = _empty_record(path)
+    try:
+        start = time.perf_counter()
+        text = extract_text(path)
+        record["timings"]["ocr"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        entities = extract_entities_with_ai(text, review=True) if _worker["use_ai"] else regex_fallback(text)
+        # Raw values validate_records dropped, and checksum-valid guesses,
+        # for manual review; kept out of the entities the forms are filled from
+        record["issues"] = entities.pop("issues", None)
+        record["suggestions"] = entities.pop("suggestions", None)
+        record["entities"] = entities
+        record["timings"]["entities"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for template in _worker["forms"]:
+            result = _worker["mapper"].auto_fill_form(entities, template)
+            record["forms"][template["formId"]] = result
+        record["timings"]["mapping"] = time.perf_counter() - start
+    except AdmissionError as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+        # 503 means "busy, try again"; every other refusal repeats on retry
+        record["rejected"] = e.status_code != 503
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+    return record
+
+# -------------------------------------------------------------------------
+# ✅ Process pool (survives workers being killed)
+# -------------------------------------------------------------------------
+
+def run_documents(paths, workers, initargs):
+    """
+    Yield one record per path. At most `workers` documents are in flight;
+    if a worker process dies (OOM killer, crash in native code) the pool is
+    broken, so the in-flight documents are recorded as failed (retried on
+    the next run) and a fresh pool carries on with the rest.
+    """
+    pending = deque(paths)
+    while pending:
+        running = {}
+        with ProcessPoolExecutor(workers, initializer=init_worker, initargs=initargs) as pool:
+            try:
+                while pending or running:
+                    while pending and len(running) < workers:
+                        running[pool.submit(process_document, pending[0])] = pending[0]
+                        pending.popleft()
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        record = future.result()
+                        del running[future]
+                        yield record
+            except BrokenProcessPool:
+                print(f"[✗] Worker process died, restarting pool ({len(running)} documents in flight)")
+                for path in running.values():
+                    record = _empty_record(path)
+                    record["error"] = "BrokenProcessPool: worker process died while processing"
+                    yield record
+
+# -------------------------------------------------------------------------
+# ✅ Reporting
+# -------------------------------------------------------------------------
+
+def print_summary(records, elapsed):
+    ok = [r for r in records if not r["error"]]
+    rejected = sum(1 for r in records if r["rejected"])
+    print("\n" + "=" * 60)
+    print(f"[BULK] Processed {len(records)} documents in {elapsed:.1f}s "
+          f"({len(records) / elapsed if elapsed else 0:.2f} docs/s), "
+          f"{len(records) - len(ok) - rejected} failed, {rejected} rejected")
+    for stage in STAGES:
+        times = sorted(r["timings"][stage] for r in ok if stage in r["timings"])
+        if not times:
+            continue
+        # nearest-rank: smallest value with at least 95% of samples at or below it
+        p95 = times[min(len(times) - 1, math.ceil(len(times) * 0.95) - 1)]
+        print(f"  - {stage:<9} total {sum(times):8.1f}s | mean {statistics.mean(times) * 1000:8.1f} ms"
+              f" | p95 {p95 * 1000:8.1f} ms")
+    print("=" * 60)
+
+
+def ndjson_to_parquet(ndjson_path, parquet_path):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    with open(ndjson_path, encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    # Nested mapping results are kept as JSON strings for a stable schema
+    table = pa.Table.from_pylist([
+        {
+            "path": r["path"],
+            "error": r["error"],
+            "rejected": r.get("rejected", False),
+            "entities": json.dumps(r["entities"], ensure_ascii=False),
+            "issues": json.dumps(r.get("issues"), ensure_ascii=False),
+            "suggestions": json.dumps(r.get("suggestions"), ensure_ascii=False),
+            "forms": json.dumps(r["forms"], ensure_ascii=False),
+            **{f"{stage}_s": r["timings"].get(stage) for stage in STAGES},
+        }
+        for r in rows
+    ])
+    pq.write_table(table, parquet_path)
+    print(f"[BULK] Wrote {len(rows)} rows → {parquet_path}")
+
+# -------------------------------------------------------------------------
+# ✅ Main Entry Point
+# -------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-extract a document archive offline.")
+    parser.add_argument("source", help="directory to walk, or manifest file with one path per line")
+    parser.add_argument("--output", required=True, help="results file (.ndjson or .parquet)")
+    parser.add_argument("--form", action="append", dest="forms",
+                        help="form id to auto-fill (repeatable, default: all forms)")
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1),
+                        help="processes, each loading its own OCR model (default: min(4, CPUs))")
+    parser.add_argument("--no-ai", action="store_true", help="use regex_fallback instead of the Groq call")
+    parser.add_argument("--max-file-mb", type=int, default=200,
+                        help="skip files larger than this (default: 200)")
+    parser.add_argument("--max-pages", type=int, default=200, help="skip PDFs with more pages (default: 200)")
+    parser.add_argument("--memory-mb", type=int, default=4096,
+                        help="memory each worker may spend on decoded pages (default: 4096)")
+    parser.add_argument("--retry-rejected", action="store_true",
+                        help="retry documents an earlier run rejected for exceeding the limits")
+    args = parser.parse_args()
+
+    form_ids = args.forms or [f["formId"] for f in get_all_forms()]
+    unknown = [fid for fid in form_ids if not get_form_template(fid)]
+    if unknown:
+        parser.error(f"unknown form id(s): {unknown}")
+
+    parquet = args.output.endswith(".parquet")
+    ndjson_path = args.output + ".ndjson" if parquet else args.output
+
+    paths = list_documents(args.source)
+    done = load_checkpoint(ndjson_path, args.retry_rejected)
+    todo = [p for p in paths if p not in done]
+    print(f"[BULK] {len(paths)} documents, {len(done)} already done, {len(todo)} to process")
+
+    threads = max(1, (os.cpu_count() or 1) // args.workers)
+    limits = {
+        "max_file_bytes": args.max_file_mb * admission.MB,
+        "max_pages": args.max_pages,
+        "memory_bytes": args.memory_mb * admission.MB,
+    }
+    records = []
+    start = time.perf_counter()
+    with open(ndjson_path, "a", encoding="utf-8") as out:
+        initargs = (form_ids, not args.no_ai, threads, limits)
+        for i, record in enumerate(run_documents(todo, args.workers, initargs), 1):
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            os.fsync(out.fileno())
+            records.append(record)
+            status = "✗" if record["error"] else "✓"
+            print(f"[{status}] {i}/{len(todo)} {record['path']}")
+
+    print_summary(records, time.perf_counter() - start)
+
+    if parquet:
+        ndjson_to_parquet(ndjson_path, args.output)
+
+
+if __name__ == "__main__":
+    main()
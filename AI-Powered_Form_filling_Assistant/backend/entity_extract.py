@@ -2,21 +2,30 @@
 import re
 import json
 import os
-from openai import OpenAI
 from dotenv import load_dotenv
-from datetime import datetime
+from profiling import stage
+from validators import is_valid_aadhaar, is_valid_pan, normalize_date, validate_records
 
 load_dotenv()
 
-client = OpenAI(
-    api_key=os.getenv("GROQ_API_KEY"),
-    base_url="https://api.groq.com/openai/v1"
-)
+def get_client():
+    """
+    Groq (OpenAI-compatible) client, created on first use.
+    Cached so the openai package is only imported by workers that call the LLM.
+    """
+    if not hasattr(get_client, "client"):
+        from openai import OpenAI
+        get_client.client = OpenAI(
+            api_key=os.getenv("GROQ_API_KEY"),
+            base_url="https://api.groq.com/openai/v1"
+        )
+    return get_client.client
 
-def extract_entities_with_ai(text):
+def extract_entities_with_ai(text, review=False):
     """
     Try AI first (keeps your existing AI flow), but always validate/normalize
     the fields with deterministic regex fallback to avoid wrong outputs.
+    review=True also returns the 'issues' / 'suggestions' of validate_records.
     """
     prompt = f"""
 You are an expert at extracting data from Indian ID cards. Return ONLY JSON with keys:
@@ -25,25 +34,26 @@ OCR TEXT:
 {text}
 """
     try:
-        response = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0
-        )
+        with stage("groq"):
+            response = get_client().chat.completions.create(
+                model="llama-3.3-70b-versatile",
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0
+            )
         result = response.choices[0].message.content
         # Try parse JSON from model
         json_match = re.search(r'\{.*\}', result, re.DOTALL)
         if json_match:
             parsed = json.loads(json_match.group(0))
             # Validate & normalize parsed data
-            return normalize_and_validate(parsed, text)
+            return normalize_and_validate(parsed, text, review)
     except Exception as e:
         print("AI extraction failed:", e)
 
     # Fallback deterministic extraction
     return regex_fallback(text)
 
-def normalize_and_validate(parsed, full_text):
+def normalize_and_validate(parsed, full_text, review=False):
     """
     Normalize fields from AI output and validate them. If AI gives something
     invalid (e.g., bad PAN), we replace with deterministic extraction.
@@ -57,22 +67,10 @@ def normalize_and_validate(parsed, full_text):
         "address": parsed.get("address")
     }
 
-    # Normalize Aadhaar (remove spaces)
-    if out["aadhar"]:
-        a = re.sub(r'\s+', '', str(out["aadhar"]))
-        if re.fullmatch(r'\d{12}', a):
-            out["aadhar"] = a
-        else:
-            out["aadhar"] = None
-
-    # Validate PAN: strict pattern AAAAA9999A
-    if out["pan"]:
-        if not re.fullmatch(r'[A-Z]{5}\d{4}[A-Z]', str(out["pan"]).strip()):
-            out["pan"] = None
-
-    # Normalize DOB: try to standardize to DD/MM/YYYY
-    if out["dob"]:
-        out["dob"] = normalize_dob(out["dob"])
+    # Aadhaar (O/I/S fixes, Verhoeff checksum), PAN (AAA[holder type]A9999A)
+    # and DOB (DD/MM/YYYY); invalid values become None
+    out = validate_records([out])[0]
+    checks = {k: out.pop(k) for k in ("issues", "suggestions") if k in out}
 
     # If AI missed something or gave invalid, use regex fallback values for reliability
     fallback = regex_fallback(full_text)
@@ -80,47 +78,15 @@ def normalize_and_validate(parsed, full_text):
         if not out[k] and fallback.get(k):
             out[k] = fallback[k]
 
+    if review:
+        out.update(checks)
     return out
 
 def normalize_dob(dob_str):
     """Try a few DOB formats and return DD/MM/YYYY or None"""
     if not dob_str: 
         return None
-    s = dob_str.strip()
-    # common dd/mm/yyyy
-    m = re.match(r'(\d{2})[\/\-](\d{2})[\/\-](\d{4})', s)
-    if m:
-        d, mth, y = m.groups()
-        try:
-            datetime(int(y), int(mth), int(d))
-            return f"{d}/{mth}/{y}"
-        except:
-            return None
-    # pattern like 0301/2004 (DDMM/YYYY)
-    m2 = re.match(r'(\d{4})[\/\-](\d{4})', s)
-    if m2:
-        part, year = m2.groups()
-        dd = part[:2]; mm = part[2:4]
-        try:
-            datetime(int(year), int(mm), int(dd))
-            return f"{dd}/{mm}/{year}"
-        except:
-            # if invalid, try swap but still validate
-            try:
-                datetime(int(year), int(dd), int(mm))
-                return f"{mm}/{dd}/{year}"
-            except:
-                return None
-    # try ISO-like YYYY-MM-DD
-    m3 = re.match(r'(\d{4})[\/\-](\d{2})[\/\-](\d{2})', s)
-    if m3:
-        y, mth, d = m3.groups()
-        try:
-            datetime(int(y), int(mth), int(d))
-            return f"{d}/{mth}/{y}"
-        except:
-            return None
-    return None
+    return normalize_date(str(dob_str))
 
 def regex_fallback(text):
     """Deterministic fallback: stricter rules, no guesswork."""
@@ -135,21 +101,23 @@ def regex_fallback(text):
 
     clean = " ".join(str(text).split())
 
-    # Aadhaar: 12 digits (allow spaces)
-    aadhar = re.search(r'\b(\d{4}\s?\d{4}\s?\d{4})\b', clean)
-    if aadhar:
-        data["aadhar"] = aadhar.group(1).replace(" ", "")
-
-    # PAN: strict - accept only if pan regex found AND context contains PAN keywords
-    pan_match = re.search(r'\b([A-Z]{5}\d{4}[A-Z])\b', clean)
-    if pan_match:
+    # Aadhaar: 12 digits (allow spaces), first one passing the Verhoeff checksum
+    for aadhar in re.finditer(r'\b(\d{4}\s?\d{4}\s?\d{4})\b', clean):
+        candidate = aadhar.group(1).replace(" ", "")
+        if is_valid_aadhaar(candidate):
+            data["aadhar"] = candidate
+            break
+
+    # PAN: strict - accept only a valid PAN with PAN keywords around it;
+    # loose PAN-looking strings without context are skipped
+    for pan_match in re.finditer(r'\b([A-Z]{5}\d{4}[A-Z])\b', clean):
+        if not is_valid_pan(pan_match.group(1)):
+            continue
         span = pan_match.span()
         ctx = clean[max(0, span[0]-50):span[1]+50]
         if re.search(r'\bPAN\b|\bIncome Tax\b|\bPermanent Account Number\b', ctx, re.I):
             data["pan"] = pan_match.group(1)
-        else:
-            # do NOT accept loose PAN-looking strings without context
-            data["pan"] = None
+            break
 
     # DOB: standard patterns or DDMM/YYYY
     dob = re.search(r'\b(\d{2}[\/\-]\d{2}[\/\-]\d{4})\b', clean)
@@ -162,11 +130,7 @@ def regex_fallback(text):
         if m:
             part, year = m.groups()
             dd = part[:2]; mm = part[2:4]
-            try:
-                datetime(int(year), int(mm), int(dd))
-                data["dob"] = f"{dd}/{mm}/{year}"
-            except:
-                data["dob"] = None
+            data["dob"] = normalize_date(f"{dd}/{mm}/{year}")
 
     # Gender
     if re.search(r'\bmale\b', clean, re.I):
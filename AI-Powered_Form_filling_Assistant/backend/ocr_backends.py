@@ -0,0 +1,199 @@
+# ocr_backends.py (pluggable OCR inference backends: EasyOCR / ONNX Runtime)
+import os
+
+import easyocr
+import torch
+from easyocr.recognition import get_text
+from easyocr.utils import CTCLabelConverter, get_image_list, reformat_input
+
+# -------------------------------------------------------------------------
+# ✅ SETTINGS (override with environment variables)
+# -------------------------------------------------------------------------
+
+# "easyocr" (stock PyTorch) or "onnx" (ONNX Runtime, int8)
+OCR_BACKEND = os.getenv("OCR_BACKEND", "easyocr")
+
+# Where exported / quantised ONNX models are cached
+ONNX_MODEL_DIR = os.getenv("OCR_ONNX_DIR", os.path.expanduser("~/.EasyOCR/onnx"))
+
+# Threads ONNX Runtime uses inside one operator (0 = all cores)
+ONNX_THREADS = int(os.getenv("OCR_ONNX_THREADS", "0"))
+
+# Height EasyOCR resizes crops to before recognition (Reader.recognize default)
+RECOG_HEIGHT = 64
+
+
+# -------------------------------------------------------------------------
+# ✅ Stock EasyOCR backend
+# -------------------------------------------------------------------------
+
+class EasyOCRBackend:
+    """
+    Common interface used by ocr_utils / ocr_batcher:
+    - readtext(image)            → EasyOCR results for one image
+    - detect(image)              → (crops, max_width) for one image
+    - recognize(crops, width, n) → results for a list of crops
+    """
+
+    name = "easyocr"
+
+    def __init__(self, langs):
+        self.langs = langs
+        self.reader = self._build_reader(langs)
+        self.ignore_char = "".join(set(self.reader.character) - set(self.reader.lang_char))
+
+    def _build_reader(self, langs):
+        return easyocr.Reader(langs, gpu=False)
+
+    def readtext(self, image):
+        return self.reader.readtext(image)
+
+    def detect(self, image):
+        img, img_cv_grey = reformat_input(image)
+        horizontal_list, free_list = self.reader.detect(img)
+        return get_image_list(horizontal_list[0], free_list[0], img_cv_grey, model_height=RECOG_HEIGHT)
+
+    def recognize(self, crops, max_width, batch_size=1):
+        return get_text(
+            self.reader.character, RECOG_HEIGHT, int(max_width),
+            self.reader.recognizer, self.reader.converter, crops,
+            ignore_char=self.ignore_char,
+            batch_size=batch_size,
+            workers=0,
+            device=self.reader.device,
+        )
+
+
+# -------------------------------------------------------------------------
+# ✅ ONNX Runtime backend (same networks, int8 dynamic quantisation)
+# -------------------------------------------------------------------------
+
+class _OnnxModule:
+    """
+    Stands in for a torch module inside EasyOCR's pre/post-processing:
+    takes torch tensors, runs an ONNX Runtime session, returns torch tensors.
+    """
+
+    def __init__(self, session):
+        self.session = session
+        self.input_name = session.get_inputs()[0].name
+
+    def eval(self):
+        return self
+
+    def __call__(self, image, *unused):
+        outputs = self.session.run(None, {self.input_name: image.cpu().numpy()})
+        outputs = [torch.from_numpy(o) for o in outputs]
+        return outputs[0] if len(outputs) == 1 else tuple(outputs)
+
+
+class _RecognizerExport(torch.nn.Module):
+    """CTC recogniser ignores its `text` argument; export it image-only."""
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, image):
+        return self.model(image, None)
+
+
+class OnnxBackend(EasyOCRBackend):
+    name = "onnx"
+
+    def _build_reader(self, langs):
+        import onnxruntime as ort
+
+        detector_path, recognizer_path = self._model_paths(langs)
+        if os.path.exists(detector_path) and os.path.exists(recognizer_path):
+            # Cached models: keep EasyOCR's pre/post-processing but never
+            # load the torch networks. Greedy CTC decoding only needs the
+            # converter, which get_recognizer would otherwise build, and the
+            # CRAFT post-processing getDetectorPath would otherwise attach.
+            from easyocr.detection import get_textbox
+
+            reader = easyocr.Reader(langs, gpu=False, detector=False, recognizer=False)
+            reader.detect_network = "craft"
+            reader.get_textbox = get_textbox
+            dict_dir = os.path.join(os.path.dirname(easyocr.__file__), "dict")
+            reader.converter = CTCLabelConverter(
+                reader.character, {}, {lang: os.path.join(dict_dir, f"{lang}.txt") for lang in langs})
+        else:
+            # fp32 weights are needed for export; the torch modules are
+            # dropped as soon as the ONNX sessions exist.
+            reader = easyocr.Reader(langs, gpu=False, quantize=False)
+            self._export_models(reader, detector_path, recognizer_path)
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = ONNX_THREADS
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+        reader.detector = _OnnxModule(ort.InferenceSession(
+            detector_path, options, providers=["CPUExecutionProvider"]))
+        reader.recognizer = _OnnxModule(ort.InferenceSession(
+            recognizer_path, options, providers=["CPUExecutionProvider"]))
+        return reader
+
+    def _model_paths(self, langs):
+        key = "_".join(langs)
+        return (
+            os.path.join(ONNX_MODEL_DIR, f"detector_{key}.int8.onnx"),
+            os.path.join(ONNX_MODEL_DIR, f"recognizer_{key}.int8.onnx"),
+        )
+
+    def _export_models(self, reader, detector_path, recognizer_path):
+        os.makedirs(ONNX_MODEL_DIR, exist_ok=True)
+
+        if not os.path.exists(detector_path):
+            print(f"[OCR] Exporting detector to ONNX → {detector_path}")
+            self._export(
+                reader.detector, torch.zeros(1, 3, 640, 640), detector_path,
+                input_axes={0: "batch", 2: "height", 3: "width"},
+                output_axes={
+                    "y": {0: "batch", 1: "height", 2: "width"},
+                    "feature": {0: "batch", 2: "height", 3: "width"},
+                },
+            )
+
+        if not os.path.exists(recognizer_path):
+            print(f"[OCR] Exporting recognizer to ONNX → {recognizer_path}")
+            self._export(
+                _RecognizerExport(reader.recognizer), torch.zeros(1, 1, RECOG_HEIGHT, 256), recognizer_path,
+                input_axes={0: "batch", 3: "width"},
+                output_axes={"preds": {0: "batch", 1: "steps"}},
+            )
+
+    def _export(self, module, dummy, path, input_axes, output_axes):
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        fp32_path = path.replace(".int8.onnx", ".fp32.onnx")
+        module.eval()
+        with torch.no_grad():
+            torch.onnx.export(
+                module, dummy, fp32_path,
+                input_names=["image"],
+                output_names=list(output_axes),
+                dynamic_axes={"image": input_axes, **output_axes},
+                opset_version=17,
+            )
+        quantize_dynamic(fp32_path, path, weight_type=QuantType.QInt8)
+        os.remove(fp32_path)
+
+
+# -------------------------------------------------------------------------
+# ✅ Backend selection
+# -------------------------------------------------------------------------
+
+BACKENDS = {
+    EasyOCRBackend.name: EasyOCRBackend,
+    OnnxBackend.name: OnnxBackend,
+}
+
+
+def create_backend(langs, name=None):
+    name = name or OCR_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown OCR backend: {name} (choose from {list(BACKENDS)})")
+    return BACKENDS[name](langs)
@@ -0,0 +1,148 @@
+# ocr_batcher.py (micro-batching of EasyOCR recognition across requests)
+import os
+import queue
+import threading
+import time
+
+from profiling import stage
+
+# -------------------------------------------------------------------------
+# ✅ SETTINGS (override with environment variables)
+# -------------------------------------------------------------------------
+
+# How long the scheduler waits for more work after the first job arrives.
+# 0 disables micro-batching (each request calls reader.readtext directly).
+BATCH_WAIT_MS = float(os.getenv("OCR_BATCH_WAIT_MS", "20"))
+
+# Maximum number of text crops recognised in one forward pass
+MAX_BATCH_CROPS = int(os.getenv("OCR_MAX_BATCH", "64"))
+
+
+class RecognitionBatcher:
+    """
+    Collects detected text crops from concurrent callers that share one
+    OCR backend (see ocr_backends.py), runs recognition on them as a single
+    batch and hands each caller back its own results.
+
+    Detection still runs on the caller's thread; only the recogniser, which
+    benefits most from larger batches on CPU, is shared.
+    """
+
+    def __init__(self, reader, max_batch=MAX_BATCH_CROPS, wait_ms=BATCH_WAIT_MS):
+        self.reader = reader
+        self.max_batch = max_batch
+        self.wait = wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    # ---------------------------------------------------------------------
+    # Caller side
+    # ---------------------------------------------------------------------
+
+    def recognize(self, segments):
+        """
+        segments: list of (image_list, max_width) as returned by
+        reader.detect, one per page. Returns one list of EasyOCR-style
+        results per segment.
+        """
+        job = {
+            "segments": segments,
+            "size": sum(len(image_list) for image_list, _ in segments),
+            "done": threading.Event(),
+            "result": None,
+            "error": None,
+        }
+        if job["size"] == 0:
+            return [[] for _ in segments]
+
+        self._queue.put(job)
+        job["done"].wait()
+        if job["error"] is not None:
+            raise job["error"]
+        return job["result"]
+
+    # ---------------------------------------------------------------------
+    # Scheduler side
+    # ---------------------------------------------------------------------
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        size = batch[0]["size"]
+        deadline = time.monotonic() + self.wait
+
+        while size < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                job = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(job)
+            size += job["size"]
+
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                self._process(batch)
+            except Exception as e:
+                for job in batch:
+                    job["error"] = e
+            for job in batch:
+                job["done"].set()
+
+    def _process(self, batch):
+        crops = []
+        max_width = 0
+        for job in batch:
+            for image_list, width in job["segments"]:
+                crops.extend(image_list)
+                max_width = max(max_width, width)
+
+        print(f"[OCR] Recognising batch: {len(batch)} jobs, {len(crops)} crops")
+        results = self.reader.recognize(crops, max_width, batch_size=self.max_batch)
+
+        # recognition keeps input order, so slice results back per segment
+        offset = 0
+        for job in batch:
+            job["result"] = []
+            for image_list, _ in job["segments"]:
+                job["result"].append(results[offset:offset + len(image_list)])
+                offset += len(image_list)
+
+
+# -------------------------------------------------------------------------
+# ✅ One batcher per script group (same lifetime as the cached reader)
+# -------------------------------------------------------------------------
+
+_batchers = {}
+_batchers_lock = threading.Lock()
+
+
+def get_batcher(script_group, reader):
+    with _batchers_lock:
+        if script_group not in _batchers:
+            _batchers[script_group] = RecognitionBatcher(reader)
+        return _batchers[script_group]
+
+
+def read_pages(reader, script_group, images):
+    """
+    Text for each page in `images` (numpy arrays). Uses the shared batcher
+    when micro-batching is enabled, plain reader.readtext otherwise.
+    """
+    if BATCH_WAIT_MS <= 0:
+        with stage("readtext"):
+            return ["\n".join([r[1] for r in reader.readtext(arr)]) for arr in images]
+
+    with stage("detection"):
+        segments = [reader.detect(arr) for arr in images]
+    # Includes time spent waiting for the batch window. Recognition itself
+    # runs on the batcher thread, which the request profiler does not sample.
+    with stage("recognition"):
+        results = get_batcher(script_group, reader).recognize(segments)
+    return ["\n".join([r[1] for r in result]) for result in results]
@@ -1,10 +1,14 @@
 # ocr_utils.py (FINAL VERSION for Hindi + Bengali + English)
-import easyocr
 import numpy as np
 import fitz  # PyMuPDF (no poppler needed)
 from PIL import Image
 import os
 
+from admission import plan_document, MEMORY_BUDGET
+from ocr_batcher import read_pages
+from ocr_backends import create_backend
+from profiling import stage
+
 # -------------------------------------------------------------------------
 # ✅ LANGUAGE GROUPS (only bn, hi, en — as per your requirement)
 # -------------------------------------------------------------------------
@@ -21,7 +25,8 @@ SCRIPT_GROUPS = {
 
 def guess_script_from_filename(path):
     """Very simple but effective script guessing."""
-    name = path.lower()
+    # File name only: folders like "archive" or "benefits" must not count
+    name = os.path.basename(path).lower()
 
     # Bengali
     if "bn" in name or "bengali" in name or "ben" in name:
@@ -35,12 +40,12 @@ def guess_script_from_filename(path):
     return "english"
 
 # -------------------------------------------------------------------------
-# ✅ Cached EasyOCR model loader
+# ✅ Cached OCR model loader
 # -------------------------------------------------------------------------
 
 def get_reader(script_group):
     """
-    Load EasyOCR reader for a script group.
+    Load the OCR backend (EasyOCR or ONNX, see OCR_BACKEND) for a script group.
     Cached so models load only once.
     """
     if not hasattr(get_reader, "cache"):
@@ -49,7 +54,7 @@ def get_reader(script_group):
     if script_group not in get_reader.cache:
         langs = SCRIPT_GROUPS[script_group]
         print(f"[OCR] Loading model for script: {script_group} → {langs}")
-        get_reader.cache[script_group] = easyocr.Reader(langs, gpu=False)
+        get_reader.cache[script_group] = create_backend(langs)
 
     return get_reader.cache[script_group]
 
@@ -66,6 +71,20 @@ def pdf_to_images(pdf_path, dpi=350):
         images.append(img)
     return images
 
+# -------------------------------------------------------------------------
+# ✅ Image loading (downsampled to the admission plan's target size)
+# -------------------------------------------------------------------------
+
+def load_image(path, target_size):
+    img = Image.open(path)
+    if target_size != img.size:
+        # JPEG: let the decoder skip detail instead of decoding full size
+        img.draft("RGB", target_size)
+    img = img.convert("RGB")
+    if img.width > target_size[0] or img.height > target_size[1]:
+        img.thumbnail(target_size, Image.LANCZOS)
+    return img
+
 # -------------------------------------------------------------------------
 # ✅ Main OCR function
 # -------------------------------------------------------------------------
@@ -76,36 +95,41 @@ def extract_text(path):
     - Auto-select correct script model
     - Handle image + PDF
     - Use EasyOCR only
+    - Refuse / downsample oversized inputs before decoding them
     """
     print("\n[OCR] Starting OCR for:", path)
 
+    # 0. Check size, pixels and pages from headers only
+    with stage("admission"):
+        plan = plan_document(path)
+
     # 1. Guess script from filename
     script_group = guess_script_from_filename(path)
     reader = get_reader(script_group)
 
-    ext = os.path.splitext(path)[1].lower()
     full_text = ""
 
-    # ---------------------------------------------------------------------
-    # ✅ If PDF → convert pages to images
-    # ---------------------------------------------------------------------
-    if ext == ".pdf":
-        images = pdf_to_images(path)
-        print(f"[OCR] PDF detected → {len(images)} pages")
-
-        for img in images:
+    with MEMORY_BUDGET.reserve(plan["estimated_bytes"]):
+        # -----------------------------------------------------------------
+        # ✅ If PDF → convert pages to images
+        # -----------------------------------------------------------------
+        if plan["kind"] == "pdf":
+            with stage("render"):
+                images = pdf_to_images(path, dpi=plan["dpi"])
+            print(f"[OCR] PDF detected → {len(images)} pages @ {plan['dpi']} DPI")
+
+            pages = read_pages(reader, script_group, [np.array(img) for img in images])
+            for page_text in pages:
+                full_text += page_text + "\n"
+
+            return full_text.strip()
+
+        # -----------------------------------------------------------------
+        # ✅ If normal image
+        # -----------------------------------------------------------------
+        with stage("render"):
+            img = load_image(path, plan["target_size"])
             arr = np.array(img)
-            result = reader.readtext(arr)
-            full_text += "\n".join([r[1] for r in result]) + "\n"
-
-        return full_text.strip()
-
-    # ---------------------------------------------------------------------
-    # ✅ If normal image
-    # ---------------------------------------------------------------------
-    img = Image.open(path).convert("RGB")
-    arr = np.array(img)
-    result = reader.readtext(arr)
-    text = "\n".join([r[1] for r in result])
+        text = read_pages(reader, script_group, [arr])[0]
 
     return text.strip()
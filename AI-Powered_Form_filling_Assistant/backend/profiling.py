@@ -0,0 +1,174 @@
+# profiling.py (opt-in per-request sampling profiler + stage timings)
+import contextvars
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from contextlib import contextmanager
+
+# -------------------------------------------------------------------------
+# ✅ SETTINGS (override with environment variables)
+# -------------------------------------------------------------------------
+
+# Admin token for the /api/admin/profiling endpoints and the X-Profile header.
+# Unset → profiling can't be switched on at all.
+ADMIN_TOKEN = os.getenv("PROFILING_ADMIN_TOKEN")
+
+# Stack sampling interval
+SAMPLE_INTERVAL = float(os.getenv("PROFILING_INTERVAL_MS", "5")) / 1000.0
+
+# How many finished profiles are kept in memory
+BUFFER_SIZE = int(os.getenv("PROFILING_BUFFER_SIZE", "50"))
+
+# Client-supplied request ids are only reused when they look like ids
+REQUEST_ID_PATTERN = re.compile(r'[A-Za-z0-9_\-]{1,64}')
+
+# Profile of the request running in this context (None when not profiled)
+_current = contextvars.ContextVar("profile", default=None)
+
+# -------------------------------------------------------------------------
+# ✅ Stage timings (no-op unless the current request is profiled)
+# -------------------------------------------------------------------------
+
+@contextmanager
+def stage(name):
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile["stages"].append({"stage": name, "ms": round((time.perf_counter() - start) * 1000, 2)})
+
+# -------------------------------------------------------------------------
+# ✅ Stack sampler (py-spy style, pure Python)
+# -------------------------------------------------------------------------
+
+class StackSampler(threading.Thread):
+    """
+    Samples one thread's stack every SAMPLE_INTERVAL and counts collapsed
+    stacks ("outer;inner;leaf" → count), the input format flamegraph.pl
+    and speedscope read.
+
+    Only the request thread is sampled. With micro-batching on, recognition
+    runs on the shared RecognitionBatcher thread, so its stacks are not in
+    the flamegraph; the request thread just shows the wait in
+    RecognitionBatcher.recognize. Use the "recognition" stage timing, or set
+    OCR_BATCH_WAIT_MS=0 to recognise on the request thread.
+    """
+
+    def __init__(self, thread_id):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.stacks = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(SAMPLE_INTERVAL):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+# -------------------------------------------------------------------------
+# ✅ Controller: who gets profiled, and where results go
+# -------------------------------------------------------------------------
+
+class Profiler:
+    def __init__(self, buffer_size=BUFFER_SIZE):
+        self.remaining = 0      # profile the next N requests
+        self.percent = 0.0      # ... or this share of traffic
+        self.profiles = deque(maxlen=buffer_size)
+        self._lock = threading.Lock()
+
+    def configure(self, next_requests=None, percent=None):
+        with self._lock:
+            if next_requests is not None:
+                self.remaining = max(0, int(next_requests))
+            if percent is not None:
+                self.percent = min(100.0, max(0.0, float(percent)))
+            return {"next": self.remaining, "percent": self.percent, "stored": len(self.profiles)}
+
+    def should_profile(self, forced=False):
+        # Unlocked fast path: profiling off is the common case
+        if not forced and not self.remaining and not self.percent:
+            return False
+        with self._lock:
+            if forced:
+                return True
+            if self.remaining:
+                self.remaining -= 1
+                return True
+        return random.random() * 100 < self.percent
+
+    def start(self, request_id, endpoint):
+        if not (request_id and REQUEST_ID_PATTERN.fullmatch(request_id)):
+            request_id = uuid.uuid4().hex
+        sampler = StackSampler(threading.get_ident())
+        profile = {
+            "id": request_id,
+            "endpoint": endpoint,
+            "started": time.time(),
+            "stages": [],
+            "_sampler": sampler,
+        }
+        profile["_token"] = _current.set(profile)
+        sampler.start()
+        return profile
+
+    def finish(self):
+        """Stop the current request's profile (if any) and store it."""
+        profile = _current.get()
+        if profile is None:
+            return None
+
+        sampler = profile.pop("_sampler")
+        sampler.stop()
+        _current.reset(profile.pop("_token"))
+        profile["duration_ms"] = round((time.time() - profile["started"]) * 1000, 2)
+        profile["samples"] = sum(sampler.stacks.values())
+        profile["stacks"] = dict(sampler.stacks)
+        with self._lock:
+            self.profiles.append(profile)
+        return profile
+
+    def _snapshot(self):
+        # Request threads append concurrently; iterating the deque itself
+        # would raise "deque mutated during iteration"
+        with self._lock:
+            return list(self.profiles)
+
+    def list(self):
+        return [
+            {k: p[k] for k in ("id", "endpoint", "started", "duration_ms", "samples", "stages")}
+            for p in self._snapshot()
+        ]
+
+    def get(self, profile_id):
+        for p in self._snapshot():
+            if p["id"] == profile_id:
+                return p
+        return None
+
+
+def collapsed(profile):
+    """Flamegraph-ready text: one 'stack count' line per collapsed stack."""
+    return "\n".join(f"{stack} {count}" for stack, count in profile["stacks"].items()) + "\n"
+
+
+profiler = Profiler()
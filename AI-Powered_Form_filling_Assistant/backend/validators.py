@@ -0,0 +1,287 @@
+# validators.py (batch validation: Aadhaar Verhoeff, PAN structure, DOB parsing)
+import re
+from datetime import datetime
+from functools import lru_cache
+
+import numpy as np
+
+# -------------------------------------------------------------------------
+# ✅ Verhoeff tables (dihedral group D5)
+# -------------------------------------------------------------------------
+
+VERHOEFF_D = np.array([
+    [0, 1, 2, 3, 4, 5, 6, 7, 8, 9],
+    [1, 2, 3, 4, 0, 6, 7, 8, 9, 5],
+    [2, 3, 4, 0, 1, 7, 8, 9, 5, 6],
+    [3, 4, 0, 1, 2, 8, 9, 5, 6, 7],
+    [4, 0, 1, 2, 3, 9, 5, 6, 7, 8],
+    [5, 9, 8, 7, 6, 0, 4, 3, 2, 1],
+    [6, 5, 9, 8, 7, 1, 0, 4, 3, 2],
+    [7, 6, 5, 9, 8, 2, 1, 0, 4, 3],
+    [8, 7, 6, 5, 9, 3, 2, 1, 0, 4],
+    [9, 8, 7, 6, 5, 4, 3, 2, 1, 0],
+], dtype=np.int8)
+
+VERHOEFF_P = np.array([
+    [0, 1, 2, 3, 4, 5, 6, 7, 8, 9],
+    [1, 5, 7, 6, 2, 8, 3, 0, 9, 4],
+    [5, 8, 0, 3, 7, 9, 6, 1, 4, 2],
+    [8, 9, 1, 6, 0, 4, 3, 5, 2, 7],
+    [9, 4, 5, 3, 1, 2, 7, 8, 6, 0],
+    [4, 2, 8, 6, 5, 7, 3, 9, 0, 1],
+    [2, 7, 9, 3, 8, 0, 6, 4, 1, 5],
+    [7, 0, 4, 6, 9, 1, 3, 2, 5, 8],
+], dtype=np.int8)
+
+# -------------------------------------------------------------------------
+# ✅ OCR confusions
+# -------------------------------------------------------------------------
+
+# The only confusions corrected automatically (0/O, 1/I, 5/S). Everything
+# else below is offered as ranked candidates for review, never auto-applied:
+# Verhoeff accepts ~1 in 10 random digit substitutions, so guessing digits
+# would invent plausible-looking but wrong Aadhaar numbers.
+AUTO_LETTER_TO_DIGIT = {"O": "0", "I": "1", "S": "5"}
+AUTO_DIGIT_TO_LETTER = {d: ch for ch, d in AUTO_LETTER_TO_DIGIT.items()}
+
+# Letters OCR returns where a digit was printed
+LETTER_TO_DIGIT = {"O": "0", "D": "0", "Q": "0", "I": "1", "L": "1", "|": "1",
+                   "S": "5", "B": "8", "Z": "2", "G": "6"}
+
+# Digits OCR returns where a letter was printed
+DIGIT_TO_LETTER = {"0": "O", "1": "I", "5": "S", "8": "B", "2": "Z", "6": "G"}
+
+# Digits that are easily misread as one another
+DIGIT_LOOKALIKES = {"0": "86", "1": "7", "3": "8", "5": "68", "6": "58", "7": "1", "8": "0356"}
+
+# PAN 4th character: type of holder
+PAN_HOLDER_TYPES = {
+    "P": "Individual",
+    "C": "Company",
+    "H": "Hindu Undivided Family",
+    "F": "Firm",
+    "A": "Association of Persons",
+    "T": "Trust",
+    "B": "Body of Individuals",
+    "L": "Local Authority",
+    "J": "Artificial Juridical Person",
+    "G": "Government",
+}
+
+PAN_PATTERN = re.compile(r'[A-Z]{3}[' + "".join(PAN_HOLDER_TYPES) + r'][A-Z]\d{4}[A-Z]')
+AADHAAR_PATTERN = re.compile(r'[2-9]\d{11}')
+
+# -------------------------------------------------------------------------
+# ✅ Aadhaar
+# -------------------------------------------------------------------------
+
+def clean_aadhaar(value):
+    """Strip spaces / dashes OCR and users put between digit groups."""
+    return re.sub(r'[\s\-]+', '', str(value or "")).upper()
+
+
+def aadhaar_checksums_valid(values):
+    """
+    Verhoeff check for a list of Aadhaar numbers at once.
+    Returns a numpy bool array; anything not shaped like an Aadhaar is False.
+    """
+    cleaned = [clean_aadhaar(v) for v in values]
+    shaped = np.array([bool(AADHAAR_PATTERN.fullmatch(v)) for v in cleaned], dtype=bool)
+    valid = np.zeros(len(cleaned), dtype=bool)
+    if not shaped.any():
+        return valid
+
+    digits = np.array([[int(ch) for ch in v] for v, ok in zip(cleaned, shaped) if ok], dtype=np.int8)
+    check = np.zeros(len(digits), dtype=np.int8)
+    # Verhoeff walks digits right-to-left
+    for i in range(12):
+        check = VERHOEFF_D[check, VERHOEFF_P[i % 8, digits[:, 11 - i]]]
+
+    valid[shaped] = check == 0
+    return valid
+
+
+def is_valid_aadhaar(value):
+    return bool(aadhaar_checksums_valid([value])[0])
+
+
+def aadhaar_candidates(value):
+    """
+    Possible corrections of an OCR'd Aadhaar number, best first, for review.
+    Letters are mapped to the digits they resemble; if the result still fails
+    the checksum, single lookalike-digit substitutions are tried.
+    Each candidate: {'value', 'valid', 'substitutions'}.
+    """
+    raw = clean_aadhaar(value)
+    base = "".join(LETTER_TO_DIGIT.get(ch, ch) for ch in raw)
+    forced = sum(1 for a, b in zip(raw, base) if a != b)
+
+    candidates = [{"value": base, "substitutions": forced}]
+    if not is_valid_aadhaar(base) and re.fullmatch(r'\d{12}', base):
+        for i, ch in enumerate(base):
+            for alt in DIGIT_LOOKALIKES.get(ch, ""):
+                candidates.append({"value": base[:i] + alt + base[i + 1:], "substitutions": forced + 1})
+
+    valid = aadhaar_checksums_valid([c["value"] for c in candidates])
+    for c, ok in zip(candidates, valid):
+        c["valid"] = bool(ok)
+
+    return sorted(candidates, key=lambda c: (not c["valid"], c["substitutions"]))
+
+
+def correct_aadhaar(value):
+    """
+    Return a checksum-valid Aadhaar for `value`, or None.
+    Only O/I/S → 0/1/5 are fixed; any other misread goes to manual entry
+    (see aadhaar_candidates for suggestions).
+    """
+    fixed = "".join(AUTO_LETTER_TO_DIGIT.get(ch, ch) for ch in clean_aadhaar(value))
+    return fixed if is_valid_aadhaar(fixed) else None
+
+# -------------------------------------------------------------------------
+# ✅ PAN
+# -------------------------------------------------------------------------
+
+def pans_valid(values):
+    """Structure check (incl. 4th-character holder type) for a list of PANs."""
+    return np.array([bool(PAN_PATTERN.fullmatch(str(v or "").strip().upper())) for v in values], dtype=bool)
+
+
+def is_valid_pan(value):
+    return bool(pans_valid([value])[0])
+
+
+def pan_holder_type(value):
+    pan = str(value or "").strip().upper()
+    return PAN_HOLDER_TYPES.get(pan[3]) if is_valid_pan(pan) else None
+
+
+def pan_candidates(value):
+    """
+    Possible corrections of an OCR'd PAN, best first. Positions 1-5 and 10
+    must be letters and 6-9 digits, so confusable characters are swapped to
+    the right class. Each candidate: {'value', 'valid', 'substitutions'}.
+    """
+    raw = re.sub(r'\s+', '', str(value or "")).upper()
+    if len(raw) != 10:
+        return [{"value": raw, "valid": False, "substitutions": 0}]
+
+    candidates = [{"value": raw, "substitutions": 0}]
+    for fixed in (_fix_pan_classes(raw, AUTO_LETTER_TO_DIGIT, AUTO_DIGIT_TO_LETTER),
+                  _fix_pan_classes(raw, LETTER_TO_DIGIT, DIGIT_TO_LETTER)):
+        if all(fixed != c["value"] for c in candidates):
+            candidates.append({"value": fixed, "substitutions": sum(1 for a, b in zip(raw, fixed) if a != b)})
+
+    valid = pans_valid([c["value"] for c in candidates])
+    for c, ok in zip(candidates, valid):
+        c["valid"] = bool(ok)
+
+    return sorted(candidates, key=lambda c: (not c["valid"], c["substitutions"]))
+
+
+def _fix_pan_classes(raw, to_digit, to_letter):
+    return "".join(
+        to_digit.get(ch, ch) if 5 <= i <= 8 else to_letter.get(ch, ch)
+        for i, ch in enumerate(raw)
+    )
+
+
+def correct_pan(value):
+    """Valid PAN for `value` after O/I/S ↔ 0/1/5 fixes only, or None."""
+    raw = re.sub(r'\s+', '', str(value or "")).upper()
+    fixed = _fix_pan_classes(raw, AUTO_LETTER_TO_DIGIT, AUTO_DIGIT_TO_LETTER)
+    return fixed if is_valid_pan(fixed) else None
+
+# -------------------------------------------------------------------------
+# ✅ Dates
+# -------------------------------------------------------------------------
+
+def _valid_date(y, m, d):
+    try:
+        datetime(int(y), int(m), int(d))
+        return True
+    except ValueError:
+        return False
+
+
+@lru_cache(maxsize=8192)
+def normalize_date(value):
+    """Try a few DOB formats and return DD/MM/YYYY or None (memoised)."""
+    if not value:
+        return None
+    s = value.strip()
+    # common dd/mm/yyyy
+    m = re.match(r'(\d{2})[\/\-](\d{2})[\/\-](\d{4})', s)
+    if m:
+        d, mth, y = m.groups()
+        return f"{d}/{mth}/{y}" if _valid_date(y, mth, d) else None
+    # pattern like 0301/2004 (DDMM/YYYY)
+    m2 = re.match(r'(\d{4})[\/\-](\d{4})', s)
+    if m2:
+        part, year = m2.groups()
+        dd = part[:2]; mm = part[2:4]
+        if _valid_date(year, mm, dd):
+            return f"{dd}/{mm}/{year}"
+        # if invalid, try swap but still validate
+        if _valid_date(year, dd, mm):
+            return f"{mm}/{dd}/{year}"
+        return None
+    # try ISO-like YYYY-MM-DD
+    m3 = re.match(r'(\d{4})[\/\-](\d{2})[\/\-](\d{2})', s)
+    if m3:
+        y, mth, d = m3.groups()
+        return f"{d}/{mth}/{y}" if _valid_date(y, mth, d) else None
+    return None
+
+
+def normalize_dates(values):
+    """Bulk version of normalize_date; repeated strings hit the cache."""
+    return [normalize_date(str(v)) if v else None for v in values]
+
+# -------------------------------------------------------------------------
+# ✅ Records (single request or offline bulk)
+# -------------------------------------------------------------------------
+
+def validate_records(records):
+    """
+    Normalise aadhar / pan / dob across a list of entity dicts in one pass.
+    Returns new dicts; invalid values become None and the raw value is kept
+    under 'issues' so reviewers can see what was dropped. Checksum-valid
+    Aadhaar guesses that were not auto-applied go under 'suggestions'.
+    """
+    aadhaars = [clean_aadhaar(r.get("aadhar")) if r.get("aadhar") else "" for r in records]
+    pans = [str(r.get("pan") or "").strip().upper() for r in records]
+
+    aadhaar_ok = aadhaar_checksums_valid(aadhaars)
+    pan_ok = pans_valid(pans)
+    dobs = normalize_dates([r.get("dob") for r in records])
+
+    out = []
+    for i, record in enumerate(records):
+        rec = dict(record)
+        issues = {}
+
+        if record.get("aadhar"):
+            rec["aadhar"] = aadhaars[i] if aadhaar_ok[i] else correct_aadhaar(aadhaars[i])
+            if rec["aadhar"] != aadhaars[i]:
+                issues["aadhar"] = record.get("aadhar")
+            if not rec["aadhar"]:
+                guesses = [c["value"] for c in aadhaar_candidates(aadhaars[i]) if c["valid"]]
+                if guesses:
+                    rec["suggestions"] = {"aadhar": guesses}
+
+        if record.get("pan"):
+            rec["pan"] = pans[i] if pan_ok[i] else correct_pan(pans[i])
+            if rec["pan"] != pans[i]:
+                issues["pan"] = record.get("pan")
+
+        if record.get("dob"):
+            rec["dob"] = dobs[i]
+            if not dobs[i]:
+                issues["dob"] = record.get("dob")
+
+        if issues:
+            rec["issues"] = issues
+        out.append(rec)
+
+    return out